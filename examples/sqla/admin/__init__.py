@@ -1,12 +1,23 @@
 from flask import Flask, request, session
 from flask_sqlalchemy import SQLAlchemy
 from flask_babelex import Babel
+from sqlalchemy import event
 
 
 app = Flask(__name__)
 app.config.from_pyfile('config.py')
 db = SQLAlchemy(app)
 
+
+# Use write-ahead logging, and only sync to disk at checkpoints, to cut down on fsync calls per commit
+@event.listens_for(db.engine, 'connect')
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
 # Initialize babel
 babel = Babel(app)
 
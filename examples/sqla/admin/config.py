@@ -1,3 +1,5 @@
+import os
+
 # set optional bootswatch theme
 # see http://bootswatch.com/3/ for available swatches
 FLASK_ADMIN_SWATCH = 'cerulean'
@@ -8,5 +10,6 @@ SECRET_KEY = '123456790'
 # Create in-memory database
 DATABASE_FILE = 'sample_db.sqlite'
 SQLALCHEMY_DATABASE_URI = 'sqlite:///' + DATABASE_FILE
-SQLALCHEMY_ECHO = True
+# Log all SQL statements only when asked to (SQLALCHEMY_ECHO=1 in the environment)
+SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO') == '1'
 SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -1,12 +1,17 @@
 from admin import db
-from admin.models import User, Post, Tag, Tree, AVAILABLE_USER_TYPES
+from admin.models import User, Post, Tag, Tree, AVAILABLE_USER_TYPES, post_tags_table, format_phone_number
 import random
 import datetime
+import itertools
+import uuid
 
 
 def build_sample_db():
     """
     Populate a small db with some example entries.
+
+    Rows are collected as plain dicts and written with a single Core INSERT
+    (executemany) per table, so primary and foreign keys are set explicitly.
     """
 
     db.drop_all()
@@ -34,35 +39,43 @@ def build_sample_db():
         ("CN", "China", 86, "CNY", "Asia/Shanghai"),
     ]
 
-    user_list = []
-    for i in range(len(first_names)):
-        user = User()
-        country = random.choice(countries)
-        user.type = random.choice(AVAILABLE_USER_TYPES)[0]
-        user.first_name = first_names[i]
-        user.last_name = last_names[i]
-        user.email = first_names[i].lower() + "@example.com"
+    # draw all random values for the users up front, with one call per attribute
+    num_users = len(first_names)
+    user_countries = random.choices(countries, k=num_users)
+    user_types = random.choices(AVAILABLE_USER_TYPES, k=num_users)
+    phone_digits = random.choices('123456789', k=9 * num_users)  # 9 digits per user
 
-        user.website = "https://www.example.com"
-        user.ip_address = "127.0.0.1"
+    user_rows = []
+    for i, (first_name, last_name, country, user_type) in enumerate(
+            zip(first_names, last_names, user_countries, user_types)):
+        _, _, dialling_code, currency, timezone = country
+        local_phone_number = '0' + ''.join(phone_digits[9 * i:9 * (i + 1)])
+        user_rows.append({
+            'id': uuid.uuid4(),
+            'type': user_type[0],
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': first_name.lower() + "@example.com",
 
-        user.coutry = country[1]
-        user.currency = country[3]
-        user.timezone = country[4]
+            'website': "https://www.example.com",
+            'ip_address': "127.0.0.1",
 
-        user.dialling_code = country[2]
-        user.local_phone_number = '0' + ''.join(random.choices('123456789', k=9))
+            'currency': currency,
+            'timezone': timezone,
 
-        user_list.append(user)
-        db.session.add(user)
+            'dialling_code': dialling_code,
+            'local_phone_number': local_phone_number,
+            # Core inserts bypass the model's validators, so fill the cached column here
+            'formatted_phone': format_phone_number(dialling_code, local_phone_number),
+        })
 
     # Create sample Tags
-    tag_list = []
-    for tmp in ["YELLOW", "WHITE", "BLUE", "GREEN", "RED", "BLACK", "BROWN", "PURPLE", "ORANGE"]:
-        tag = Tag()
-        tag.name = tmp
-        tag_list.append(tag)
-        db.session.add(tag)
+    tag_rows = []
+    for i, tmp in enumerate(["YELLOW", "WHITE", "BLUE", "GREEN", "RED", "BLACK", "BROWN", "PURPLE", "ORANGE"]):
+        tag_rows.append({'id': i + 1, 'name': tmp})
+
+    db.session.execute(User.__table__.insert(), user_rows)
+    db.session.execute(Tag.__table__.insert(), tag_rows)
 
     # Create sample Posts
     sample_text = [
@@ -103,31 +116,38 @@ doloribus asperiores repellat."
         }
     ]
 
-    for user in user_list:
-        entry = random.choice(sample_text)  # select text at random
-        post = Post()
-        post.user = user
-        post.title = "{}'s opinion on {}".format(user.first_name, entry['title'])
-        post.text = entry['content']
-        post.background_color = random.choice(["#cccccc", "red", "lightblue", "#0f0"])
-        tmp = int(1000 * random.random())  # random number between 0 and 1000:
-        post.date = datetime.datetime.now() - datetime.timedelta(days=tmp)
-        post.tags = random.sample(tag_list, 2)  # select a couple of tags at random
-        db.session.add(post)
+    post_rows = []
+    post_tag_rows = []
+    num_posts = len(user_rows)
+    entries = random.choices(sample_text, k=num_posts)  # select texts at random
+    colors = random.choices(["#cccccc", "red", "lightblue", "#0f0"], k=num_posts)
+    ages = random.choices(range(1000), k=num_posts)  # random numbers of days between 0 and 1000
+    # a couple of distinct tags per post, picked from all possible pairs
+    tag_pairs = random.choices(list(itertools.combinations(tag_rows, 2)), k=num_posts)
+    for i, (user, entry, color, tmp, tags) in enumerate(zip(user_rows, entries, colors, ages, tag_pairs)):
+        post_rows.append({
+            'id': i + 1,
+            'user_id': user['id'],
+            'title': "{}'s opinion on {}".format(user['first_name'], entry['title']),
+            'text': entry['content'],
+            'background_color': color,
+            'date': datetime.datetime.now() - datetime.timedelta(days=tmp),
+        })
+        for tag in tags:
+            post_tag_rows.append({'post_id': i + 1, 'tag_id': tag['id']})
+
+    db.session.execute(Post.__table__.insert(), post_rows)
+    db.session.execute(post_tags_table.insert(), post_tag_rows)
 
     # Create a sample Tree structure
-    trunk = Tree(name="Trunk")
-    db.session.add(trunk)
+    tree_rows = [{'id': 1, 'name': "Trunk", 'parent_id': None}]
     for i in range(5):
-        branch = Tree()
-        branch.name = "Branch " + str(i + 1)
-        branch.parent = trunk
-        db.session.add(branch)
+        branch_id = len(tree_rows) + 1
+        tree_rows.append({'id': branch_id, 'name': "Branch " + str(i + 1), 'parent_id': 1})
         for j in range(5):
-            leaf = Tree()
-            leaf.name = "Leaf " + str(j + 1)
-            leaf.parent = branch
-            db.session.add(leaf)
+            tree_rows.append({'id': len(tree_rows) + 1, 'name': "Leaf " + str(j + 1), 'parent_id': branch_id})
+
+    db.session.execute(Tree.__table__.insert(), tree_rows)
 
     db.session.commit()
     return
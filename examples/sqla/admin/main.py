@@ -2,14 +2,17 @@ from admin import app, db
 from admin.models import AVAILABLE_USER_TYPES, User, Post, Tag, Tree
 from flask import Markup, send_file
 
+from sqlalchemy.orm import joinedload, load_only, selectinload, undefer
 from wtforms import validators
 
 import flask_admin as admin
 from flask_admin.base import MenuLink
 from flask_admin.contrib import sqla
 from flask_admin.contrib.sqla import filters
+from flask_admin.contrib.sqla.ajax import QueryAjaxModelLoader
 from flask_admin.contrib.sqla.filters import BaseSQLAFilter, FilterEqual
 from flask_admin.babel import gettext
+from flask_admin.tools import iterdecode
 
 
 # Flask views
@@ -50,11 +53,15 @@ class FilterLastNameBrown(BaseSQLAFilter):
 
 # Customized User model admin
 def phone_number_formatter(view, context, model, name):
-    return Markup("<nobr>{}</nobr>".format(model.phone_number)) if model.phone_number else None
+    return Markup("<nobr>{}</nobr>".format(model.formatted_phone)) if model.formatted_phone else None
+
+
+# deletes ASCII digits, so anything left over is not a number
+_NON_DIGIT_TBL = str.maketrans('', '', '0123456789')
 
 
 def is_numberic_validator(form, field):
-    if field.data and not field.data.isdigit():
+    if field.data and field.data.translate(_NON_DIGIT_TBL):
         raise validators.ValidationError(gettext('Only numbers are allowed.'))
 
 
@@ -142,6 +149,12 @@ class UserAdmin(sqla.ModelView):
     ]
     column_formatters = {'phone_number': phone_number_formatter}
 
+    # the details (and edit) view always shows the featured post, so fetch it in the same query
+    def get_one(self, id):
+        return self.session.query(self.model).options(
+            joinedload(User.featured_post)
+        ).get(iterdecode(id))
+
     # setup edit forms so that only posts created by this user can be selected as 'featured'
     def edit_form(self, obj):
         return self._filtered_posts(
@@ -149,10 +162,22 @@ class UserAdmin(sqla.ModelView):
         )
 
     def _filtered_posts(self, form):
-        form.featured_post.query_factory = lambda: Post.query.filter(Post.user_id == form._obj.id).all()
+        # the field caches the query results itself, and the choices only show the titles
+        form.featured_post.query_factory = lambda: Post.query.options(
+            load_only(Post.id, Post.title)
+        ).filter(Post.user_id == form._obj.id).all()
         return form
 
 
+# Custom AJAX loader: the lookup only displays the user's name (see `User.__str__`),
+# so don't fetch the remaining columns on every keystroke
+class UserAjaxModelLoader(QueryAjaxModelLoader):
+    def get_query(self):
+        return super(UserAjaxModelLoader, self).get_query().options(
+            load_only(User.first_name, User.last_name)
+        )
+
+
 # Customized Post model admin
 class PostAdmin(sqla.ModelView):
     column_display_pk = True
@@ -209,9 +234,7 @@ class PostAdmin(sqla.ModelView):
     }
 
     form_ajax_refs = {
-        'user': {
-            'fields': (User.first_name, User.last_name)
-        },
+        'user': UserAjaxModelLoader('user', db.session, User, fields=(User.first_name, User.last_name)),
         'tags': {
             'fields': (Tag.name,),
             'minimum_input_length': 0,  # show suggestions, even before any user input
@@ -220,10 +243,25 @@ class PostAdmin(sqla.ModelView):
         },
     }
 
+    # only join the (many-to-one) user onto the list query; the tags collection is
+    # loaded with a single 'IN' query in `get_query`, see below
+    column_select_related_list = (Post.user, )
+
     def __init__(self, session):
         # Just call parent class with predefined model.
         super(PostAdmin, self).__init__(Post, session)
 
+    def get_query(self):
+        return super(PostAdmin, self).get_query().options(
+            selectinload(Post.tags)
+        )
+
+    # the edit form needs the deferred text column, so fetch it along with the post
+    def get_one(self, id):
+        return self.session.query(self.model).options(
+            undefer(Post.text)
+        ).get(iterdecode(id))
+
 
 class TreeView(sqla.ModelView):
     list_template = 'tree_list.html'
@@ -236,6 +274,13 @@ class TreeView(sqla.ModelView):
     form_excluded_columns = ['children', ]
     column_filters = ['id', 'name', 'parent', ]
 
+    # self-referential relations are skipped by `column_auto_select_related`, so load the
+    # parents of the listed nodes explicitly; they aren't always on the same page
+    def get_query(self):
+        return super(TreeView, self).get_query().options(
+            selectinload(Tree.parent)
+        )
+
     # override the 'render' method to pass your own parameters to the template
     def render(self, template, **kwargs):
         return super(TreeView, self).render(template, foo="bar", **kwargs)
@@ -1,5 +1,6 @@
 from admin import db
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import validates
 from sqlalchemy import sql, cast
 import uuid
 
@@ -22,9 +23,16 @@ class EnumChoices(enum.Enum):
     second = 2
 
 
+def format_phone_number(dialling_code, local_phone_number):
+    if dialling_code and local_phone_number:
+        number = str(local_phone_number)
+        return "+{} ({}) {} {} {}".format(dialling_code, number[0], number[1:3], number[3:6], number[6::])
+    return
+
+
 # Create models
 class User(db.Model):
-    id = db.Column(UUIDType(binary=False), default=uuid.uuid4, primary_key=True)
+    id = db.Column(UUIDType(binary=True), default=uuid.uuid4, primary_key=True)
 
     # use a regular string field, for which we can specify a list of available choices later on
     type = db.Column(db.String(100))
@@ -46,51 +54,72 @@ class User(db.Model):
 
     dialling_code = db.Column(db.Integer())
     local_phone_number = db.Column(db.String(10))
+    # cached result of `format_phone_number`, kept up to date by `update_formatted_phone`
+    formatted_phone = db.Column(db.String(32))
 
     featured_post_id = db.Column(db.Integer, db.ForeignKey('post.id'))
     featured_post = db.relationship('Post', foreign_keys=[featured_post_id])
 
+    # explicit counterpart of `Post.user`, so that each side can be given its own loader
+    # strategy; views that need the related rows eager-load them per query
+    posts = db.relationship('Post', foreign_keys='Post.user_id', back_populates='user', lazy='select')
+
     @hybrid_property
     def phone_number(self):
-        if self.dialling_code and self.local_phone_number:
-            number = str(self.local_phone_number)
-            return "+{} ({}) {} {} {}".format(self.dialling_code, number[0], number[1:3], number[3:6], number[6::])
-        return
+        return format_phone_number(self.dialling_code, self.local_phone_number)
 
     @phone_number.expression
     def phone_number(cls):
-        return sql.operators.ColumnOperators.concat(cast(cls.dialling_code, db.String), cls.local_phone_number)
+        # computed by the database, so searching, filtering and sorting on it doesn't require
+        # loading the rows; unlike the formatted value above, the local number's digits are
+        # kept together, so that searching for (part of) a local number still matches
+        return sql.literal('+') + cast(cls.dialling_code, db.String) + ' ' + cls.local_phone_number
+
+    @validates('dialling_code', 'local_phone_number')
+    def update_formatted_phone(self, key, value):
+        parts = {
+            'dialling_code': self.dialling_code,
+            'local_phone_number': self.local_phone_number,
+        }
+        parts[key] = value
+        self.formatted_phone = format_phone_number(**parts)
+        return value
 
     def __str__(self):
-        return "{}, {}".format(self.last_name, self.first_name)
+        return f"{self.last_name}, {self.first_name}"
 
     def __repr__(self):
-        return "{}: {}".format(self.id, self.__str__())
+        return f"{self.id}: {self}"
+
 
+# Index the user names in the order UserAdmin and PostAdmin sort on them; it also serves
+# the equality filters on last_name
+db.Index('ix_user_names', User.last_name, User.first_name)
 
 # Create M2M table
 post_tags_table = db.Table('post_tags', db.Model.metadata,
-                           db.Column('post_id', db.Integer, db.ForeignKey('post.id')),
-                           db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'))
+                           db.Column('post_id', db.Integer, db.ForeignKey('post.id'), index=True),
+                           db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), index=True)
                            )
 
 
 class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120))
-    text = db.Column(db.Text, nullable=False)
-    date = db.Column(db.Date)
+    # not shown in the list view or exports, so only load it when it's accessed
+    text = db.deferred(db.Column(db.Text, nullable=False))
+    date = db.Column(db.Date, index=True)
 
     # some sqlalchemy_utils data types (see https://sqlalchemy-utils.readthedocs.io/)
     background_color = db.Column(ColorType)
-    created_at = db.Column(ArrowType, default=arrow.utcnow())
-    user_id = db.Column(UUIDType(binary=False), db.ForeignKey(User.id))
+    created_at = db.Column(ArrowType, default=arrow.utcnow)
+    user_id = db.Column(UUIDType(binary=True), db.ForeignKey(User.id), index=True)
 
-    user = db.relationship(User, foreign_keys=[user_id], backref='posts')
+    user = db.relationship(User, foreign_keys=[user_id], back_populates='posts', lazy='select')
     tags = db.relationship('Tag', secondary=post_tags_table)
 
     def __str__(self):
-        return "{}".format(self.title)
+        return f"{self.title}"
 
 
 class Tag(db.Model):
@@ -98,7 +127,7 @@ class Tag(db.Model):
     name = db.Column(db.Unicode(64), unique=True)
 
     def __str__(self):
-        return "{}".format(self.name)
+        return f"{self.name}"
 
 
 class Tree(db.Model):
@@ -107,7 +136,8 @@ class Tree(db.Model):
 
     # recursive relationship
     parent_id = db.Column(db.Integer, db.ForeignKey('tree.id'))
-    parent = db.relationship('Tree', remote_side=[id], backref='children')
+    parent = db.relationship('Tree', remote_side=[id], back_populates='children')
+    children = db.relationship('Tree', back_populates='parent')
 
     def __str__(self):
-        return "{}".format(self.name)
+        return f"{self.name}"